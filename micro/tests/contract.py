@@ -0,0 +1,177 @@
+"""Version matrix contract checks.
+
+Enumerate every (route, method, version) combination an application
+exposes and check that each one answers with the expected status code and
+echoes the negotiated version in the ``X-Version`` header.
+"""
+import collections
+import logging
+import multiprocessing
+import os
+
+from micro import api_version_request
+from micro import utils
+
+LOG = logging.getLogger(__name__)
+
+# `version` is the value sent in the ``X-Version`` header (None to send no
+# header at all) and `expected_version` the one the response must echo.
+# An `expected_status` of None means any successful (2xx or 3xx) status.
+Case = collections.namedtuple(
+    'Case',
+    ['url', 'method', 'version', 'expected_status', 'expected_version'])
+
+Failure = collections.namedtuple(
+    'Failure', ['case', 'status', 'echoed_version'])
+
+# Methods Flask adds on its own to every rule, they are not worth checking.
+IMPLICIT_METHODS = {'HEAD', 'OPTIONS'}
+
+# Methods for which we send a (minimal) JSON body.
+BODY_METHODS = {'POST', 'PUT', 'PATCH'}
+
+# Test client `open` method used by the current worker process, see
+# `_init_worker`.
+_open = None
+
+
+def _split(version: api_version_request.APIVersionRequest):
+    return tuple(int(part) for part in version.get_string().split('.'))
+
+
+def api_versions(app):
+    """Return the API versions between the global minimum and maximum.
+
+    The number of minor versions of a major version which is not the
+    maximum one is unknown, so we go up to the highest minor version of
+    that major version referenced by the global minimum or the versioned
+    endpoints of `app`. Minor versions above that are not returned, a
+    warning is logged for each major version concerned.
+    """
+    min_major, min_minor = _split(api_version_request.min_api_version())
+    max_major, max_minor = _split(api_version_request.max_api_version())
+
+    highest_minor = collections.defaultdict(int)
+    highest_minor[min_major] = min_minor
+    highest_minor[max_major] = max_minor
+    for versioned_methods in app.versioned_endpoints.values():
+        for method in versioned_methods:
+            for bound in (method.start_version, method.end_version):
+                if bound:
+                    major, minor = _split(bound)
+                    if major != max_major:
+                        highest_minor[major] = max(highest_minor[major], minor)
+
+    versions = []
+    for major in range(min_major, max_major + 1):
+        first = min_minor if major == min_major else 0
+        for minor in range(first, highest_minor[major] + 1):
+            versions.append('%s.%s' % (major, minor))
+        if major != max_major:
+            LOG.warning("Versions above %s.%s are not tested, the highest "
+                        "minor version of major version %s is unknown.",
+                        major, highest_minor[major], major)
+    return versions
+
+
+def expected_status(app, endpoint: str, version: str):
+    """Return the status code a request at `version` should get.
+
+    None stands for any successful status.
+    """
+    if endpoint not in app.versioned_endpoints:
+        return None
+    version_request = api_version_request.APIVersionRequest(version)
+    for method in app.versioned_endpoints[endpoint]:
+        if version_request.matches_versioned_method(method):
+            return None
+    return 404
+
+
+def contract_cases(app, overrides=None):
+    """Build the list of `Case` covering the URL map of `app`.
+
+    Each rule is requested at every version returned by `api_versions`, with
+    ``latest`` and without any ``X-Version`` header.
+
+    Rules expecting arguments (e.g ``/items/<int:id>``) can't be turned into
+    an URL without knowing valid values, so they are left out. The same
+    goes for the static files endpoint.
+
+    :param overrides: optional mapping of ``(endpoint, method)`` to the exact
+        status code expected when the endpoint is available at the
+        requested version, instead of any 2xx or 3xx status.
+    """
+    overrides = overrides or {}
+    min_ver = api_version_request.min_api_version().get_string()
+    max_ver = api_version_request.max_api_version().get_string()
+    # (header value, negotiated version)
+    versions = [(version, version) for version in api_versions(app)]
+    versions += [(None, min_ver), ('latest', max_ver)]
+
+    cases = []
+    for rule in app.url_map.iter_rules():
+        if rule.arguments or rule.endpoint == 'static':
+            continue
+        for method in sorted(rule.methods - IMPLICIT_METHODS):
+            for version, negotiated in versions:
+                status = expected_status(app, rule.endpoint, negotiated)
+                if status is None:
+                    status = overrides.get((rule.endpoint, method))
+                cases.append(
+                    Case(rule.rule, method, version, status, negotiated))
+    return cases
+
+
+def _init_worker(app):
+    global _open
+    _open = utils.add_json_kwarg(app.test_client().open)
+
+
+def _check(case: Case):
+    """Run a single `Case`, return a `Failure` or None if it passed."""
+    headers = {}
+    if case.version is not None:
+        headers[api_version_request.HEADER_NAME] = case.version
+    json = None
+    if case.method in BODY_METHODS:
+        json = {'version': case.expected_version}
+    response = _open(
+        case.url, method=case.method, headers=headers, json=json)
+
+    echoed_version = response.headers.get(api_version_request.HEADER_NAME)
+    if case.expected_status is None:
+        status_ok = 200 <= response.status_code < 400
+    else:
+        status_ok = response.status_code == case.expected_status
+    if not status_ok or echoed_version != case.expected_version:
+        return Failure(case, response.status_code, echoed_version)
+    return None
+
+
+def run_contract(app, cases=None, processes=None):
+    """Check `cases` against `app` and return the list of `Failure`.
+
+    The cases, by default the matrix returned by `contract_cases`, are
+    spread over `processes` worker processes (one per CPU by default). Each
+    worker builds its own test client once. The application is handed to the
+    workers by forking, so where fork isn't available, or if a single
+    process is asked for, the cases are run in the current process.
+    """
+    if cases is None:
+        cases = contract_cases(app)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(cases))
+
+    if (processes <= 1 or
+            'fork' not in multiprocessing.get_all_start_methods()):
+        _init_worker(app)
+        results = map(_check, cases)
+        return [failure for failure in results if failure]
+
+    context = multiprocessing.get_context('fork')
+    chunksize = max(1, len(cases) // (processes * 4))
+    with context.Pool(processes, _init_worker, (app,)) as pool:
+        results = pool.imap(_check, cases, chunksize)
+        return [failure for failure in results if failure]
@@ -0,0 +1,72 @@
+import unittest
+from unittest import mock
+
+from micro import app
+from micro.tests import contract
+
+
+class TestVersionMatrix(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cases = contract.contract_cases(app)
+
+    def test_api_versions(self):
+        self.assertEqual(['1.0', '1.1', '1.2'], contract.api_versions(app))
+
+    @mock.patch('micro.api_version_request.MAX_API_VERSION', (2, 1))
+    @mock.patch('micro.api_version_request.MIN_API_VERSION', (1, 5))
+    def test_api_versions_across_major_versions(self):
+        with self.assertLogs(contract.LOG, 'WARNING') as logs:
+            versions = contract.api_versions(app)
+        self.assertEqual(['1.5', '2.0', '2.1'], versions)
+        self.assertIn('Versions above 1.5 are not tested', logs.output[0])
+
+    def test_cases(self):
+        self.assertIn(
+            contract.Case('/min_version', 'GET', '1.0', 404, '1.0'),
+            self.cases)
+        self.assertIn(
+            contract.Case('/max_version', 'GET', '1.1', None, '1.1'),
+            self.cases)
+        self.assertIn(
+            contract.Case('/double_decorator', 'GET', '1.1', 404, '1.1'),
+            self.cases)
+        self.assertIn(
+            contract.Case('/', 'POST', '1.2', None, '1.2'), self.cases)
+        for case in self.cases:
+            self.assertNotIn(case.method, contract.IMPLICIT_METHODS)
+
+    def test_cases_without_header_and_latest(self):
+        self.assertIn(
+            contract.Case('/min_version', 'GET', None, 404, '1.0'),
+            self.cases)
+        self.assertIn(
+            contract.Case('/min_version', 'GET', 'latest', None, '1.2'),
+            self.cases)
+        self.assertIn(
+            contract.Case('/max_version', 'GET', 'latest', 404, '1.2'),
+            self.cases)
+
+    def test_cases_with_overrides(self):
+        cases = contract.contract_cases(
+            app, overrides={('index', 'POST'): 201})
+        self.assertIn(contract.Case('/', 'POST', '1.1', 201, '1.1'), cases)
+        self.assertIn(contract.Case('/', 'GET', '1.1', None, '1.1'), cases)
+
+        failures = contract.run_contract(app, cases)
+        self.assertEqual(5, len(failures))
+        for failure in failures:
+            self.assertEqual(('/', 'POST'), failure.case[:2])
+            self.assertEqual(200, failure.status)
+
+    def test_matrix(self):
+        self.assertEqual([], contract.run_contract(app, self.cases))
+
+    def test_matrix_single_process(self):
+        self.assertEqual(
+            [], contract.run_contract(app, self.cases, processes=1))
+
+    def test_failure_reported(self):
+        case = contract.Case('/min_version', 'GET', '1.0', None, '1.0')
+        failures = contract.run_contract(app, [case, case], processes=2)
+        self.assertEqual([contract.Failure(case, 404, '1.0')] * 2, failures)